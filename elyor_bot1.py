@@ -8,7 +8,11 @@ import time
 import asyncio
 import html
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+# Startup timings (seconds) reported once the bot is warm
+_STARTUP_T0 = time.perf_counter()
+STARTUP_TIMINGS: Dict[str, float] = {}
 
 from telegram import (
     Update,
@@ -18,12 +22,14 @@ from telegram import (
 )
 from telegram.ext import (
     Application,
+    BaseUpdateProcessor,
     CommandHandler,
     CallbackQueryHandler,
     MessageHandler,
     ContextTypes,
     filters,
 )
+STARTUP_TIMINGS["import_telegram"] = time.perf_counter() - _STARTUP_T0
 
 # ---------------- Configuration ----------------
 BOT_TOKEN = os.getenv("BOT_TOKEN")
@@ -33,6 +39,28 @@ if not BOT_TOKEN:
 # ADMIN_IDS: comma-separated integers, e.g. "12345,67890"
 ADMIN_IDS = [int(x) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip().isdigit()]
 DB_PATH = os.getenv("DB_PATH", "elyor_bot.db")
+# seconds a warmed channel list / VPN code stays cached before re-reading the DB
+CACHE_TTL = float(os.getenv("CACHE_TTL", "30"))
+# optional file created once the bot is warm (used by the Docker HEALTHCHECK)
+READY_FILE = os.getenv("READY_FILE", "")
+
+# Admission control, per update type ("start", "callback", "message", "other"):
+#   <TYPE>_CONCURRENCY handlers at once, <TYPE>_QUEUE waiting, <TYPE>_DEADLINE seconds max wait
+ADMISSION_DEFAULTS = {
+    "start": (8, 500, 15.0),
+    "callback": (8, 500, 15.0),
+    "message": (4, 100, 10.0),
+    "other": (2, 50, 10.0),
+}
+# reply "busy, try again" to shed updates instead of dropping them silently
+BUSY_REPLY = os.getenv("BUSY_REPLY", "1") != "0"
+# budget for those replies (per second / in flight); over budget the update is dropped silently
+BUSY_REPLY_RATE = float(os.getenv("BUSY_REPLY_RATE", "10"))
+BUSY_REPLY_CONCURRENCY = int(os.getenv("BUSY_REPLY_CONCURRENCY", "4"))
+# identical updates from the same user within this many seconds are processed once
+COALESCE_WINDOW = float(os.getenv("COALESCE_WINDOW", "2"))
+# seconds between admission stats log lines (0 disables)
+ADMISSION_LOG_INTERVAL = float(os.getenv("ADMISSION_LOG_INTERVAL", "60"))
 
 # ---------------- Logging ----------------
 logging.basicConfig(
@@ -166,8 +194,8 @@ async def bot_is_admin_of(app: Application, channel: str) -> bool:
     channel: @username or -100id or full link is OK (parse handled in callsites)
     """
     try:
-        me = await app.bot.get_me()
-        member = await app.bot.get_chat_member(chat_id=channel, user_id=me.id)
+        # bot identity is fetched once by Application.initialize()
+        member = await app.bot.get_chat_member(chat_id=channel, user_id=app.bot.id)
         return getattr(member, "status", "") in ("administrator", "creator")
     except Exception as e:
         logger.debug("bot_is_admin_of failed for %s: %s", channel, e)
@@ -216,6 +244,288 @@ def make_channels_keyboard(channels: List[Dict[str, Any]]) -> InlineKeyboardMark
     rows.append([InlineKeyboardButton("✅ Agza boldum", callback_data="confirm_subs")])
     return InlineKeyboardMarkup(rows)
 
+# ---------------- Warm caches ----------------
+# Filled by post_init before polling starts, refreshed after CACHE_TTL and
+# dropped by admin actions that change channels / VPN codes.
+_cache: Dict[str, Any] = {
+    "channels": None,
+    "channels_kb": None,
+    "channels_until": 0.0,
+    "vpn": None,
+    "vpn_until": 0.0,
+}
+
+def refresh_channels_cache() -> List[Dict[str, Any]]:
+    """
+    Reload active admin channels and precompute their keyboard.
+    The entry expires after CACHE_TTL or at the first channel's show_until, whichever is sooner.
+    """
+    channels = get_channels(active_only=True, only_admin=True)
+    until = time.time() + CACHE_TTL
+    for ch in channels:
+        if ch["show_until"] and ch["show_until"] > 0:
+            until = min(until, ch["show_until"] + 1)
+    _cache["channels_kb"] = make_channels_keyboard(channels) if channels else None
+    _cache["channels"] = channels
+    _cache["channels_until"] = until
+    return channels
+
+def get_active_channels() -> Tuple[List[Dict[str, Any]], Optional[InlineKeyboardMarkup]]:
+    """Cached get_channels(active_only=True, only_admin=True) plus its keyboard."""
+    if _cache["channels"] is None or time.time() >= _cache["channels_until"]:
+        refresh_channels_cache()
+    return _cache["channels"], _cache["channels_kb"]
+
+def refresh_vpn_cache() -> Optional[Tuple[int, str]]:
+    rows = db_execute("SELECT id, text FROM vpn_codes ORDER BY created_at DESC LIMIT 1", fetch=True) or []
+    _cache["vpn"] = tuple(rows[0]) if rows else None
+    _cache["vpn_until"] = time.time() + CACHE_TTL
+    return _cache["vpn"]
+
+def get_latest_vpn() -> Optional[Tuple[int, str]]:
+    """Cached (id, text) of the newest VPN code, or None."""
+    if time.time() >= _cache["vpn_until"]:
+        return refresh_vpn_cache()
+    return _cache["vpn"]
+
+def invalidate_cache(channels: bool = False, vpn: bool = False):
+    if channels:
+        _cache["channels"] = None
+        _cache["channels_kb"] = None
+    if vpn:
+        _cache["vpn_until"] = 0.0
+
+# ---------------- Admission control ----------------
+BUSY_TEXT = "⏳ Bot häzir gaty köp ýüklenen. Birazdan täzeden synanyşyň."
+
+class _Lane:
+    __slots__ = ("concurrency", "max_queue", "deadline", "semaphore",
+                 "queued", "active", "processed", "shed_full", "shed_deadline", "coalesced",
+                 "shed_silent")
+
+    def __init__(self, concurrency: int, max_queue: int, deadline: float):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.queued = 0
+        self.active = 0
+        self.processed = 0
+        self.shed_full = 0
+        self.shed_deadline = 0
+        self.coalesced = 0
+        self.shed_silent = 0
+
+def update_kind(update: Update) -> str:
+    if update.callback_query:
+        return "callback"
+    if update.message:
+        if (update.message.text or "").startswith("/start"):
+            return "start"
+        return "message"
+    return "other"
+
+class AdmissionProcessor(BaseUpdateProcessor):
+    """
+    Update processor that sits in front of all handlers:
+      - each update type has its own concurrency limit and bounded wait queue
+      - updates arriving to a full queue, or waiting longer than the type's deadline,
+        are shed (answered with BUSY_TEXT when BUSY_REPLY is on and the reply budget allows)
+      - identical updates from one user within COALESCE_WINDOW are processed once
+      - admins bypass admission, but each admin's updates run one at a time since
+        admin flows keep state in context.user_data (e.g. a broadcast and the next adm_action)
+    """
+
+    def __init__(self):
+        self.lanes: Dict[str, _Lane] = {}
+        for kind, (conc, queue, deadline) in ADMISSION_DEFAULTS.items():
+            prefix = kind.upper()
+            self.lanes[kind] = _Lane(
+                max(1, int(os.getenv(f"{prefix}_CONCURRENCY", conc))),
+                max(0, int(os.getenv(f"{prefix}_QUEUE", queue))),
+                float(os.getenv(f"{prefix}_DEADLINE", deadline)),
+            )
+        # insertion-ordered by admission time, so expired keys are popped from the front
+        self._recent: Dict[Tuple[str, int, str], float] = {}
+        self._admin_locks: Dict[int, asyncio.Lock] = {}
+        self._busy_tokens = BUSY_REPLY_RATE
+        self._busy_refilled = time.monotonic()
+        self._busy_inflight = 0
+        self._log_task: Optional[asyncio.Task] = None
+        # lanes bound their own work; the base semaphore only needs room for all of it plus admins
+        super().__init__(sum(l.concurrency + l.max_queue for l in self.lanes.values()) + 16)
+
+    async def do_process_update(self, update: object, coroutine):
+        if not isinstance(update, Update):
+            await coroutine
+            return
+        user = update.effective_user
+        if user and is_admin(user.id):
+            async with self._admin_locks.setdefault(user.id, asyncio.Lock()):
+                await coroutine
+            return
+
+        lane = self.lanes[update_kind(update)]
+        arrived = time.monotonic()
+        key = self._coalesce_key(update)
+
+        if key and self._is_duplicate(key, arrived):
+            lane.coalesced += 1
+            coroutine.close()
+            if update.callback_query:
+                await self._answer(lane, update, None)
+            return
+
+        if lane.queued >= lane.max_queue and lane.active >= lane.concurrency:
+            lane.shed_full += 1
+            coroutine.close()
+            await self._answer(lane, update, BUSY_TEXT)
+            return
+
+        # admitted: from here on, repeats of this update are coalesced
+        if key:
+            self._remember(key, arrived)
+
+        # wait for a slot no longer than the lane's latency budget
+        lane.queued += 1
+        try:
+            await asyncio.wait_for(lane.semaphore.acquire(), timeout=lane.deadline - (time.monotonic() - arrived))
+            acquired = True
+        except asyncio.TimeoutError:
+            acquired = False
+        except BaseException:
+            coroutine.close()
+            raise
+        finally:
+            lane.queued -= 1
+
+        # backstop: a slot granted right at the deadline is still too late
+        if acquired and time.monotonic() - arrived > lane.deadline:
+            # free the slot before the busy reply's network call
+            lane.semaphore.release()
+            acquired = False
+
+        if not acquired:
+            lane.shed_deadline += 1
+            coroutine.close()
+            if key:
+                # the user was told to try again, so the retry must not be coalesced
+                self._recent.pop(key, None)
+            await self._answer(lane, update, BUSY_TEXT)
+            return
+
+        try:
+            lane.active += 1
+            try:
+                await coroutine
+            finally:
+                lane.active -= 1
+                lane.processed += 1
+        finally:
+            lane.semaphore.release()
+
+    @staticmethod
+    def _coalesce_key(update: Update) -> Optional[Tuple[str, int, str]]:
+        if COALESCE_WINDOW <= 0 or not update.effective_user:
+            return None
+        if update.callback_query:
+            payload = update.callback_query.data or ""
+        elif update.message:
+            payload = update.message.text or ""
+        else:
+            return None
+        return (update_kind(update), update.effective_user.id, payload)
+
+    def _is_duplicate(self, key: Tuple[str, int, str], now: float) -> bool:
+        seen = self._recent.get(key)
+        return seen is not None and now - seen < COALESCE_WINDOW
+
+    def _remember(self, key: Tuple[str, int, str], now: float):
+        # re-insert so the key moves to the end and the dict stays ordered by time
+        self._recent.pop(key, None)
+        self._recent[key] = now
+        while self._recent:
+            old_key, seen = next(iter(self._recent.items()))
+            if now - seen < COALESCE_WINDOW:
+                break
+            del self._recent[old_key]
+
+    def _take_busy_token(self) -> bool:
+        """Token bucket (BUSY_REPLY_RATE/s) plus an in-flight cap for shed/coalesced replies."""
+        if self._busy_inflight >= BUSY_REPLY_CONCURRENCY:
+            return False
+        now = time.monotonic()
+        self._busy_tokens = min(BUSY_REPLY_RATE, self._busy_tokens + (now - self._busy_refilled) * BUSY_REPLY_RATE)
+        self._busy_refilled = now
+        if self._busy_tokens < 1:
+            return False
+        self._busy_tokens -= 1
+        return True
+
+    async def _answer(self, lane: _Lane, update: Update, text: Optional[str]):
+        """
+        Fast reply for shed/coalesced updates; text=None only stops a button's spinner.
+        Over the reply budget nothing is sent, so a spike can't starve admitted handlers
+        of connections or flood limit.
+        """
+        if text and not BUSY_REPLY:
+            return
+        if not (update.callback_query or (text and update.message)):
+            return
+        if not self._take_busy_token():
+            lane.shed_silent += 1
+            return
+        self._busy_inflight += 1
+        try:
+            if update.callback_query:
+                await update.callback_query.answer(text)
+            else:
+                await update.message.reply_text(text)
+        except Exception as e:
+            logger.debug("admission reply failed: %s", e)
+        finally:
+            self._busy_inflight -= 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {
+            kind: {
+                "active": l.active,
+                "concurrency": l.concurrency,
+                "queued": l.queued,
+                "max_queue": l.max_queue,
+                "processed": l.processed,
+                "shed_full": l.shed_full,
+                "shed_deadline": l.shed_deadline,
+                "coalesced": l.coalesced,
+                "shed_silent": l.shed_silent,
+            }
+            for kind, l in self.lanes.items()
+        }
+
+    def format_stats(self) -> str:
+        lines = []
+        for kind, st in self.snapshot().items():
+            lines.append(
+                f"• {kind}: işleýär {st['active']}/{st['concurrency']} | nobat {st['queued']}/{st['max_queue']} | "
+                f"işlenen {st['processed']} | taşlanan {st['shed_full'] + st['shed_deadline']} "
+                f"(doly {st['shed_full']}, gijä galan {st['shed_deadline']}) | birleşdirilen {st['coalesced']} | jogapsyz {st['shed_silent']}"
+            )
+        return "\n".join(lines)
+
+    async def _log_loop(self):
+        while True:
+            await asyncio.sleep(ADMISSION_LOG_INTERVAL)
+            logger.info("Admission stats: %s", self.snapshot())
+
+    async def initialize(self):
+        if ADMISSION_LOG_INTERVAL > 0:
+            self._log_task = asyncio.create_task(self._log_loop())
+
+    async def shutdown(self):
+        if self._log_task:
+            self._log_task.cancel()
+            self._log_task = None
+
 # ---------------- Handlers (User) ----------------
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -227,9 +537,8 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         db_execute("INSERT OR REPLACE INTO users(user_id, username, first_name) VALUES (?, ?, ?)",
                    (user.id, user.username or "", user.first_name or ""))
 
-    bot_me = await context.bot.get_me()
-    bot_name = bot_me.username or ""
-    channels = get_channels(active_only=True, only_admin=True)
+    bot_name = context.bot.username or ""
+    channels, kb = get_active_channels()
 
     if not channels:
         # no admin channels available
@@ -246,7 +555,6 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "2️⃣ Soňra <b>Agza boldum</b> düwmesine basyň.\n\n"
         "📌 Bu bot size admin tarapyndan düzülen full tizlikde 7/24 işleýän VPN kodyny mugt berýär."
     )
-    kb = make_channels_keyboard(channels)
     await update.message.reply_text(text, reply_markup=kb, parse_mode=constants.ParseMode.HTML)
 
 # ---------------- Callback dispatcher ----------------
@@ -260,7 +568,7 @@ async def callback_dispatcher(update: Update, context: ContextTypes.DEFAULT_TYPE
 
     # Confirm subscriptions flow
     if data == "confirm_subs":
-        channels = get_channels(active_only=True, only_admin=True)
+        channels, _ = get_active_channels()
         missing = []
         for ch in channels:
             ok = await check_user_member(context.application, ch["link"], user.id)
@@ -277,11 +585,11 @@ async def callback_dispatcher(update: Update, context: ContextTypes.DEFAULT_TYPE
             return
 
         # All channels OK -> send latest VPN (admin-provided)
-        rows = db_execute("SELECT id, text FROM vpn_codes ORDER BY created_at DESC LIMIT 1", fetch=True) or []
-        if not rows:
+        latest = get_latest_vpn()
+        if not latest:
             await query.edit_message_text("🎉 Siz ähli kanallara agza boldyňyz.\n\n🔑 Häzirki wagtda admin VPN kody goşmandyr.")
             return
-        vpn_id, vpn_text = rows[0]
+        vpn_id, vpn_text = latest
         try:
             safe_vpn = html.escape(vpn_text)
             await context.bot.send_message(chat_id=user.id,
@@ -392,6 +700,9 @@ async def admin_callbacks_dispatch(query, context: ContextTypes.DEFAULT_TYPE):
             f"• VPN kod sany: {vpn_count}\n"
             f"• Jemi ugratylan VPN sany: {total_sent}"
         )
+        processor = context.application.update_processor
+        if isinstance(processor, AdmissionProcessor):
+            txt += "\n\n📈 Ýük:\n" + processor.format_stats()
         await query.edit_message_text(txt)
         return
 
@@ -524,6 +835,7 @@ async def text_admin_action(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # update bot_admin flag
         ba = 1 if await bot_is_admin_of(context.application, link) else 0
         db_execute("UPDATE channels SET bot_admin = ? WHERE link = ?", (ba, link))
+        invalidate_cache(channels=True)
         await update.message.reply_text(f"✅ Kanal goşuldy: {html.escape(title)} ({html.escape(link)})\nBot admin status: {'Bar' if ba else 'Ýok'}")
         context.user_data.pop("adm_action", None)
         return
@@ -564,6 +876,7 @@ async def text_admin_action(update: Update, context: ContextTypes.DEFAULT_TYPE):
                    (link, title, max_subs, order_num, show_until, cid))
         ba = 1 if await bot_is_admin_of(context.application, link) else 0
         db_execute("UPDATE channels SET bot_admin = ? WHERE id = ?", (ba, cid))
+        invalidate_cache(channels=True)
         await update.message.reply_text(f"✅ Kanal üýtgedildi: ID {cid}")
         context.user_data.pop("adm_action", None)
         return
@@ -577,6 +890,7 @@ async def text_admin_action(update: Update, context: ContextTypes.DEFAULT_TYPE):
             context.user_data.pop("adm_action", None)
             return
         db_execute("DELETE FROM channels WHERE id = ?", (cid,))
+        invalidate_cache(channels=True)
         await update.message.reply_text(f"✅ Kanal id={cid} pozuldy.")
         context.user_data.pop("adm_action", None)
         return
@@ -584,6 +898,7 @@ async def text_admin_action(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Add vpn
     if action == "add_vpn":
         db_execute("INSERT INTO vpn_codes(text) VALUES (?)", (txt,))
+        invalidate_cache(vpn=True)
         await update.message.reply_text("✅ VPN kody goşuldy.")
         context.user_data.pop("adm_action", None)
         return
@@ -597,6 +912,7 @@ async def text_admin_action(update: Update, context: ContextTypes.DEFAULT_TYPE):
             context.user_data.pop("adm_action", None)
             return
         db_execute("DELETE FROM vpn_codes WHERE id = ?", (vid,))
+        invalidate_cache(vpn=True)
         await update.message.reply_text(f"✅ VPN id={vid} pozuldy.")
         context.user_data.pop("adm_action", None)
         return
@@ -652,9 +968,74 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE):
     logger.exception("Exception in handler", exc_info=context.error)
 
 # ---------------- Startup / Main ----------------
+async def warmup(application: Application):
+    """
+    Preload what the first /start and confirm callbacks need: channel list + keyboard
+    and the latest VPN code. Bot identity needs no preload, Application.initialize()
+    already fetched it with get_me() before post_init runs.
+    """
+    async def timed(name: str, func):
+        t0 = time.perf_counter()
+        await asyncio.to_thread(func)
+        STARTUP_TIMINGS[name] = time.perf_counter() - t0
+
+    t = time.perf_counter()
+    await asyncio.gather(
+        timed("channels_and_keyboard", refresh_channels_cache),
+        timed("vpn_codes", refresh_vpn_cache),
+    )
+    STARTUP_TIMINGS["warmup"] = time.perf_counter() - t
+
+def log_startup_report():
+    STARTUP_TIMINGS["total"] = time.perf_counter() - _STARTUP_T0
+    report = ", ".join(f"{name}={secs * 1000:.1f}ms" for name, secs in STARTUP_TIMINGS.items())
+    logger.info("Startup timings: %s", report)
+
+async def post_init(application: Application):
+    # schema creation must succeed; a failure here stops the bot like it did in main()
+    t = time.perf_counter()
+    await asyncio.to_thread(init_db)
+    STARTUP_TIMINGS["init_db"] = time.perf_counter() - t
+
+    try:
+        await warmup(application)
+    except Exception as e:
+        # caches fill lazily on first use, so the bot still works, just cold
+        logger.exception("Warmup failed, starting cold: %s", e)
+        log_startup_report()
+        return
+    if READY_FILE:
+        try:
+            with open(READY_FILE, "w") as f:
+                f.write(str(int(time.time())))
+        except OSError as e:
+            logger.warning("Could not write ready file %s: %s", READY_FILE, e)
+    log_startup_report()
+    logger.info("Bot is warm and ready.")
+
+def remove_ready_file():
+    if READY_FILE:
+        try:
+            os.remove(READY_FILE)
+        except OSError:
+            pass
+
+async def post_shutdown(application: Application):
+    remove_ready_file()
+
 def main():
-    init_db()
-    application = Application.builder().token(BOT_TOKEN).build()
+    # a crash or SIGKILL skips post_shutdown; don't report ready before this run's warmup
+    remove_ready_file()
+    t = time.perf_counter()
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .concurrent_updates(AdmissionProcessor())
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
+    STARTUP_TIMINGS["build_application"] = time.perf_counter() - t
 
     # User handlers
     application.add_handler(CommandHandler("start", start))